@@ -1,13 +1,20 @@
 import streamlit as st
 import os
-from datetime import datetime, timedelta
-from dateutil.parser import parse
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain.schema import HumanMessage, SystemMessage
 import requests
-from typing import Dict, List, Optional
-import json
+import diskcache
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Iterator, List, Optional
+import sqlite3
+import threading
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from build_airports_db import find_airport_code
 
 # Load environment variables
 load_dotenv()
@@ -24,8 +31,59 @@ llm = ChatGroq(
     temperature=0.7
 )
 
-def get_weather_data(city: str) -> Dict:
-    """Get current weather and forecast data for a city"""
+# Default (connect, read) timeout for outbound HTTP calls
+REQUEST_TIMEOUT = (3, 10)
+# Overpass only answers once the query has finished, so cover its 10s query timeout
+OVERPASS_TIMEOUT = (3, 15)
+
+# Hosts contacted on every trip plan, pre-connected when the session is created;
+# AviationStack is only contacted when its API key is configured
+WARMUP_URLS = (
+    "http://api.openweathermap.org/",
+    "https://nominatim.openstreetmap.org/",
+    "https://overpass-api.de/"
+) + (("http://api.aviationstack.com/",) if AVIATIONSTACK_API_KEY else ())
+
+def _warm_up_session(session: requests.Session) -> None:
+    """Open pooled connections to the known API hosts ahead of the first request"""
+    for url in WARMUP_URLS:
+        try:
+            session.head(url, timeout=REQUEST_TIMEOUT)
+        except Exception:
+            pass  # Warm-up is best effort; real requests report their own errors
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Create a shared HTTP session with keep-alive connection pooling"""
+    session = requests.Session()
+    session.headers["User-Agent"] = "TravelPlanner/1.0"  # Required by Nominatim
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=2, backoff_factor=0.3)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    threading.Thread(target=_warm_up_session, args=(session,), daemon=True).start()
+    return session
+
+# Directory containing this app, so data files don't depend on the working directory
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Directory for lookups that should survive app restarts
+DISK_CACHE_DIR = os.path.join(APP_DIR, ".travel_cache")
+# Geocodes barely change, so keep them on disk for a month
+GEOCODE_DISK_TTL = 30 * 86400
+# Generated trip plans are shared across sessions for a week
+TRIP_PLAN_DISK_TTL = 7 * 86400
+
+@st.cache_resource
+def get_disk_cache() -> diskcache.Cache:
+    """Open the persistent on-disk cache shared by all sessions"""
+    return diskcache.Cache(DISK_CACHE_DIR)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _fetch_weather(city: str) -> Dict:
+    """Fetch current weather from OpenWeather; errors propagate so they are not cached"""
     base_url = "http://api.openweathermap.org/data/2.5/weather"
     params = {
         "q": city,
@@ -33,97 +91,143 @@ def get_weather_data(city: str) -> Dict:
         "units": "metric"
     }
     
+    response = get_http_session().get(base_url, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+def get_weather_data(city: str) -> Dict:
+    """Get current weather and forecast data for a city"""
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        return response.json()
+        return _fetch_weather(city.strip().lower())
     except Exception as e:
         st.error(f"Error fetching weather data: {str(e)}")
         return {}
 
-def get_city_coordinates(city: str) -> tuple:
-    """Get city coordinates using OpenStreetMap Nominatim API"""
+@st.cache_data(ttl=86400, max_entries=1024, show_spinner=False)
+def _geocode_city(city: str) -> tuple:
+    """Resolve coordinates via the disk cache, falling back to Nominatim"""
+    disk_cache = get_disk_cache()
+    cache_key = ("geocode", city)
+    coordinates = disk_cache.get(cache_key)
+    if coordinates is not None:
+        return coordinates
+
     url = f"https://nominatim.openstreetmap.org/search"
     params = {
         "q": city,
         "format": "json",
-        "limit": 1
-    }
-    headers = {
-        "User-Agent": "TravelPlanner/1.0"  # Required by Nominatim
+        "limit": 1,
+        # Only lat/lon are read, so ask for the smallest possible record
+        "addressdetails": 0,
+        "extratags": 0,
+        "namedetails": 0,
+        "accept-language": "en"
     }
     
-    try:
-        response = requests.get(url, params=params, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        if data:
-            return float(data[0]["lat"]), float(data[0]["lon"])
+    response = get_http_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    if not data:
         return None, None
+
+    coordinates = float(data[0]["lat"]), float(data[0]["lon"])
+    disk_cache.set(cache_key, coordinates, expire=GEOCODE_DISK_TTL)
+    return coordinates
+
+def get_city_coordinates(city: str) -> tuple:
+    """Get city coordinates using OpenStreetMap Nominatim API"""
+    try:
+        return _geocode_city(city.strip().lower())
     except Exception as e:
         st.error(f"Error fetching city coordinates: {str(e)}")
         return None, None
 
-def search_hotels(city: str) -> List[Dict]:
-    """Search for hotels using OpenStreetMap Overpass API"""
-    # First get city coordinates
-    lat, lon = get_city_coordinates(city)
-    if lat is None or lon is None:
-        return []
-    
+# Hotel fields mapped to their OSM tags, with the values shown when a tag is missing
+HOTEL_TAGS = {"name": "name", "stars": "stars", "phone": "phone", "website": "website"}
+HOTEL_DEFAULTS = {
+    "name": "Unnamed Hotel",
+    "stars": "N/A",
+    "phone": "Phone not available",
+    "website": "Website not available"
+}
+ADDRESS_TAGS = {"street": "addr:street", "city": "addr:city", "country": "addr:country"}
+ADDRESS_DEFAULTS = {
+    "street": "Street not available",
+    "country": "Country not available"
+}
+
+def _hotel_from_element(element: Dict) -> Dict:
+    """Convert an Overpass node into a hotel record, filling in defaults"""
+    tags = element.get("tags", {})
+    return {
+        **HOTEL_DEFAULTS,
+        **{field: tags[tag] for field, tag in HOTEL_TAGS.items() if tag in tags},
+        "address": {
+            **ADDRESS_DEFAULTS,
+            **{field: tags[tag] for field, tag in ADDRESS_TAGS.items() if tag in tags}
+        },
+        "coordinates": {
+            "lat": element.get("lat"),
+            "lon": element.get("lon")
+        }
+    }
+
+# Only hotel nodes are used, so ask for nothing else and let the server
+# cap the result at the 3 we display
+OVERPASS_HOTEL_QUERY = """
+[out:json][timeout:10];
+node["tourism"="hotel"](around:{radius},{lat},{lon});
+out body 3;
+"""
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _fetch_hotels(lat: float, lon: float) -> List[Dict]:
+    """Query Overpass for hotels around a point; errors propagate so they are not cached"""
     # Define the search radius (in meters)
     radius = 5000  # 5km radius
     
-    # Overpass API query to find hotels
+    # Overpass API query to find hotels; coordinates are rounded to ~1m so
+    # repeat lookups produce byte-identical queries for upstream caches
     overpass_url = "https://overpass-api.de/api/interpreter"
-    overpass_query = f"""
-    [out:json][timeout:25];
-    (
-      node["tourism"="hotel"](around:{radius},{lat},{lon});
-      way["tourism"="hotel"](around:{radius},{lat},{lon});
-      relation["tourism"="hotel"](around:{radius},{lat},{lon});
-    );
-    out body;
-    >;
-    out skel qt;
-    """
+    overpass_query = OVERPASS_HOTEL_QUERY.format(radius=radius, lat=round(lat, 5), lon=round(lon, 5))
     
+    response = get_http_session().post(overpass_url, data={"data": overpass_query}, timeout=OVERPASS_TIMEOUT)
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    # Overpass reports query timeouts and other runtime errors with HTTP 200
+    # and a "remark", so treat those as failures rather than "no hotels"
+    if data.get("remark"):
+        raise RuntimeError(f"Overpass query failed: {data['remark']}")
+
+    return [_hotel_from_element(element) for element in data.get("elements", [])]
+
+def search_hotels(city: str) -> List[Dict]:
+    """Search for hotels using OpenStreetMap Overpass API"""
+    city = city.strip()
+    # First get city coordinates; geocoding reports its own errors
+    lat, lon = get_city_coordinates(city)
+    if lat is None or lon is None:
+        return []
+
     try:
-        response = requests.post(overpass_url, data={"data": overpass_query})
-        response.raise_for_status()
-        data = response.json()
-        
-        hotels = []
-        for element in data.get("elements", [])[:5]:  # Limit to top 5 hotels
-            if element.get("type") == "node":  # Only process node elements for simplicity
-                tags = element.get("tags", {})
-                hotel = {
-                    "name": tags.get("name", "Unnamed Hotel"),
-                    "address": {
-                        "street": tags.get("addr:street", "Street not available"),
-                        "city": tags.get("addr:city", city),
-                        "country": tags.get("addr:country", "Country not available")
-                    },
-                    "stars": tags.get("stars", "N/A"),
-                    "phone": tags.get("phone", "Phone not available"),
-                    "website": tags.get("website", "Website not available"),
-                    "coordinates": {
-                        "lat": element.get("lat"),
-                        "lon": element.get("lon")
-                    }
-                }
-                hotels.append(hotel)
-                
-                if len(hotels) >= 3:  # Limit to 3 hotels
-                    break
-        
-        return hotels
+        hotels = _fetch_hotels(lat, lon)
     except Exception as e:
         st.error(f"Error fetching hotel data: {str(e)}")
         return []
 
-def search_flights(origin: str, destination: str) -> List[Dict]:
+    # The cache is keyed on coordinates, so fall back to the city as the
+    # user typed it here; st.cache_data hands out copies, so this is safe
+    for hotel in hotels:
+        hotel["address"].setdefault("city", city)
+    return hotels
+
+def search_flights(origin: Optional[str], destination: Optional[str]) -> List[Dict]:
     """Search for flights using AviationStack API"""
+    # Without a key or with an unresolved airport the call cannot succeed,
+    # so don't spend a round trip (and API quota) on it
+    if not AVIATIONSTACK_API_KEY or origin is None or destination is None:
+        return []
+
     url = "http://api.aviationstack.com/v1/flights"
     params = {
         "access_key": AVIATIONSTACK_API_KEY,
@@ -133,9 +237,9 @@ def search_flights(origin: str, destination: str) -> List[Dict]:
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = get_http_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         flights = []
         for flight in data.get("data", [])[:3]:
@@ -155,27 +259,63 @@ def search_flights(origin: str, destination: str) -> List[Dict]:
         st.error(f"Error fetching flight data: {str(e)}")
         return []
 
-def get_airport_code(city: str) -> str:
-    """Get airport code for a city using OpenFlights data"""
-    # Using a simplified airport code mapping
-    airport_codes = {
-        "tokyo": "HND",
-        "osaka": "KIX",
-        "kyoto": "KIX",  # Kyoto uses Osaka's airport
-        "delhi": "DEL",
-        "mumbai": "BOM",
-        "udaipur": "UDR",
-        "london": "LHR",
-        "paris": "CDG",
-        "new york": "JFK",
-        "singapore": "SIN",
-        "bangkok": "BKK"
-    }
-    return airport_codes.get(city.lower(), city[:3].upper())
+# Curated city -> airport code mapping, built once at import. Besides the
+# original shortlist it pins the main airport for cities the airports database
+# can't rank (several large airports) or can't find (OurAirports files the
+# airport under a different municipality)
+AIRPORT_CODES = MappingProxyType({
+    "tokyo": "HND",
+    "osaka": "KIX",
+    "kyoto": "KIX",  # Kyoto uses Osaka's airport
+    "delhi": "DEL",
+    "mumbai": "BOM",
+    "udaipur": "UDR",
+    "london": "LHR",
+    "paris": "CDG",
+    "new york": "JFK",
+    "singapore": "SIN",
+    "bangkok": "BKK",
+    "bali": "DPS",
+    "barcelona": "BCN",
+    "beijing": "PEK",
+    "brussels": "BRU",
+    "buenos aires": "EZE",
+    "chicago": "ORD",
+    "frankfurt": "FRA",
+    "istanbul": "IST",
+    "milan": "MXP",
+    "moscow": "SVO",
+    "orlando": "MCO",
+    "seoul": "ICN",
+    "shanghai": "PVG",
+    "taipei": "TPE",
+    "tehran": "IKA",
+    "washington": "IAD"
+})
 
-def generate_trip_plan(city: str, days: int, month: str) -> str:
-    """Generate a trip plan using LangChain and Groq"""
-    system_prompt = """You are a knowledgeable travel advisor. Provide detailed information about the city, including:
+# SQLite database of OurAirports airports, built by build_airports_db.py
+AIRPORTS_DB_PATH = os.path.join(APP_DIR, "airports.db")
+
+@st.cache_resource
+def get_airports_db() -> Optional[sqlite3.Connection]:
+    """Open the bundled airports database read-only, if it is present"""
+    if not os.path.exists(AIRPORTS_DB_PATH):
+        return None
+    return sqlite3.connect(f"file:{AIRPORTS_DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+
+def lookup_airport_code(city: str) -> Optional[str]:
+    """Look up the main IATA code for a city in the airports database"""
+    db = get_airports_db()
+    if db is None:
+        return None
+    return find_airport_code(db, city)
+
+def get_airport_code(city: str) -> Optional[str]:
+    """Get airport code for a city using OurAirports data, or None if it is unknown"""
+    city = city.strip().lower()
+    return AIRPORT_CODES.get(city) or lookup_airport_code(city)
+
+SYSTEM_PROMPT = """You are a knowledgeable travel advisor. Provide detailed information about the city, including:
     1. A paragraph about the city's cultural and historical significance
     2. Major attractions and must-visit places
     3. Local cuisine recommendations
@@ -183,16 +323,35 @@ def generate_trip_plan(city: str, days: int, month: str) -> str:
     5. Transportation tips
     6. Cultural etiquette and customs
     Format the response in a clear, organized manner."""
-    
+# The system prompt never changes, so build its message once and reuse it
+SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_PROMPT)
+
+def generate_trip_plan(city: str, days: int, month: str) -> Iterator[str]:
+    """Generate a trip plan using LangChain and Groq, streaming it as it is written"""
+    city, days, month = city.strip(), int(days), month.strip()
+    disk_cache = get_disk_cache()
+    # Normalize only the cache key; the prompt keeps the names as entered
+    cache_key = ("trip_plan", city.lower(), days, month.lower())
+    trip_plan = disk_cache.get(cache_key)
+    if trip_plan is not None:
+        yield trip_plan
+        return
+
     messages = [
-        SystemMessage(content=system_prompt),
+        SYSTEM_MESSAGE,
         HumanMessage(content=f"Create a {days}-day trip plan for {city} in {month}.")
     ]
     
-    response = llm.invoke(messages)
-    return response.content
+    chunks = []
+    for chunk in llm.stream(messages):
+        chunks.append(chunk.content)
+        yield chunk.content
+    disk_cache.set(cache_key, "".join(chunks), expire=TRIP_PLAN_DISK_TTL)
 
 def main():
+    # Create the shared session on page load so its warm-up finishes before the first click
+    get_http_session()
+
     st.title("🌍 AI Travel Planner")
     st.write("Plan your perfect trip with AI-powered recommendations and real-time data!")
 
@@ -211,52 +370,72 @@ def main():
 
     if st.button("Plan My Trip"):
         with st.spinner("Generating your perfect trip plan..."):
-            # Get weather data
-            weather_data = get_weather_data(city)
-            if weather_data:
-                st.subheader("🌤️ Weather Information")
-                temp = weather_data.get("main", {}).get("temp")
-                weather_desc = weather_data.get("weather", [{}])[0].get("description")
-                st.write(f"Current temperature: {temp}°C")
-                st.write(f"Weather conditions: {weather_desc}")
-
-            # Generate trip plan
-            trip_plan = generate_trip_plan(city, days, month)
-            st.subheader("🗺️ Your Trip Plan")
-            st.write(trip_plan)
-
-            # Get hotel recommendations
-            st.subheader("🏨 Hotel Options")
-            hotels = search_hotels(city)
-            if hotels:
-                for hotel in hotels:
-                    st.write(f"- {hotel['name']}")
-                    address = hotel['address']
-                    st.write(f"  Address: {address['street']}, {address['city']}, {address['country']}")
-                    if hotel['stars'] != "N/A":
-                        st.write(f"  Rating: {hotel['stars']} stars")
-                    if hotel['phone'] != "Phone not available":
-                        st.write(f"  Phone: {hotel['phone']}")
-                    if hotel['website'] != "Website not available":
-                        st.write(f"  Website: {hotel['website']}")
-                    st.write(f"  [View on Map](https://www.openstreetmap.org/?mlat={hotel['coordinates']['lat']}&mlon={hotel['coordinates']['lon']}#map=16/{hotel['coordinates']['lat']}/{hotel['coordinates']['lon']})")
-                    st.write("---")
-            else:
-                st.warning("Could not fetch hotel data. Please check hotel booking websites directly.")
-
-            # Get flight options
-            st.subheader("✈️ Flight Options")
-            origin_code = get_airport_code(origin_city)
-            dest_code = get_airport_code(city)
-            flights = search_flights(origin_code, dest_code)
-            
-            if flights:
-                for flight in flights:
-                    st.write(f"- {flight['airline']} - Flight {flight['flight_number']}")
-                    st.write(f"  Departure: {flight['departure']}")
-                    st.write(f"  Arrival: {flight['arrival']}")
-            else:
-                st.warning("Could not fetch real-time flight data. Please check airline websites directly.")
+            # Fire off all network-bound work at once so the page waits on the
+            # slowest call instead of the sum of all of them
+            ctx = get_script_run_ctx()
+            with ThreadPoolExecutor(
+                max_workers=3,
+                initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)
+            ) as executor:
+                weather_future = executor.submit(get_weather_data, city)
+                hotels_future = executor.submit(search_hotels, city)
+                flights_future = executor.submit(
+                    search_flights, get_airport_code(origin_city), get_airport_code(city)
+                )
+
+                # Reserve the weather section so the plan can start streaming
+                # without waiting on OpenWeather
+                weather_section = st.container()
+
+                # Stream the trip plan while the other lookups are still being fetched
+                st.subheader("🗺️ Your Trip Plan")
+                st.write_stream(generate_trip_plan(city, days, month))
+
+                # Get weather data
+                weather_data = weather_future.result()
+                if weather_data:
+                    with weather_section:
+                        st.subheader("🌤️ Weather Information")
+                        temp = weather_data.get("main", {}).get("temp")
+                        weather_desc = weather_data.get("weather", [{}])[0].get("description")
+                        st.write(f"Current temperature: {temp}°C")
+                        st.write(f"Weather conditions: {weather_desc}")
+
+                # Get hotel recommendations
+                st.subheader("🏨 Hotel Options")
+                hotels = hotels_future.result()
+                if hotels:
+                    for hotel in hotels:
+                        # Assemble each hotel into one markdown block so it renders as a single element
+                        address = hotel['address']
+                        lines = [
+                            f"- {hotel['name']}",
+                            f"  Address: {address['street']}, {address['city']}, {address['country']}"
+                        ]
+                        if hotel['stars'] != HOTEL_DEFAULTS["stars"]:
+                            lines.append(f"  Rating: {hotel['stars']} stars")
+                        if hotel['phone'] != HOTEL_DEFAULTS["phone"]:
+                            lines.append(f"  Phone: {hotel['phone']}")
+                        if hotel['website'] != HOTEL_DEFAULTS["website"]:
+                            lines.append(f"  Website: {hotel['website']}")
+                        lines.append(f"  [View on Map](https://www.openstreetmap.org/?mlat={hotel['coordinates']['lat']}&mlon={hotel['coordinates']['lon']}#map=16/{hotel['coordinates']['lat']}/{hotel['coordinates']['lon']})")
+                        st.markdown("  \n".join(lines) + "\n\n---")
+                else:
+                    st.warning("Could not fetch hotel data. Please check hotel booking websites directly.")
+
+                # Get flight options
+                st.subheader("✈️ Flight Options")
+                flights = flights_future.result()
+
+                if flights:
+                    st.markdown("\n".join(
+                        f"- {flight['airline']} - Flight {flight['flight_number']}  \n"
+                        f"  Departure: {flight['departure']}  \n"
+                        f"  Arrival: {flight['arrival']}"
+                        for flight in flights
+                    ))
+                else:
+                    st.warning("Could not fetch real-time flight data. Please check airline websites directly.")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""Build airports.db from the OurAirports airports.csv file.
+
+The bundled airports.db was built from the OurAirports snapshot shipped in
+the ourairports 1.1.0.20221011 package. To refresh it, download
+https://davidmegginson.github.io/ourairports-data/airports.csv (or .csv.gz)
+and run:
+
+    python build_airports_db.py airports.csv
+
+Airports are ranked by their OurAirports type (large, medium, small) and
+only those with scheduled service are kept. The data has no traffic figures,
+so cities with several large airports (Chicago: ORD/MDW, Paris: CDG/ORY, ...)
+fall back to file order; app.py pins the main airport for those in
+AIRPORT_CODES. Lookups are by city name only, so a name shared across
+countries resolves to the highest-ranked airport anywhere (e.g. "Barcelona"
+would tie between Spain and Venezuela without an override).
+"""
+import csv
+import gzip
+import os
+import re
+import sqlite3
+import sys
+import unicodedata
+from typing import Dict, Optional
+
+# OurAirports airport types, best first; anything else with scheduled
+# service (heliports, seaplane bases) ranks after these
+AIRPORT_TYPE_RANKS = {"large_airport": 0, "medium_airport": 1, "small_airport": 2}
+OTHER_TYPE_RANK = len(AIRPORT_TYPE_RANKS)
+
+# How closely a lookup key matches the airport's municipality
+EXACT_MATCH = 0
+PARTIAL_MATCH = 1
+
+def _fold_accents(text: str) -> str:
+    """Strip diacritics so "Montréal" can also be found as "montreal" """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+def city_keys(municipality: str) -> Dict[str, int]:
+    """Map every lookup key for a municipality to how closely it matches"""
+    name = municipality.strip().lower()
+    keys = {name: EXACT_MATCH, _fold_accents(name): EXACT_MATCH}
+
+    # "Shanghai (Pudong)" -> "shanghai", "Arnavutköy, Istanbul" -> "istanbul"
+    for part in re.sub(r"\s*\(.*?\)", "", name).split(","):
+        part = part.strip()
+        if part:
+            for key in (part, _fold_accents(part)):
+                keys.setdefault(key, PARTIAL_MATCH)
+    return keys
+
+def build_airports_db(source_path: str, db_path: str) -> int:
+    """Load scheduled-service airports into a SQLite table indexed by city"""
+    opener = gzip.open if source_path.endswith(".gz") else open
+    rows = []
+    with opener(source_path, "rt", newline="", encoding="utf-8") as source:
+        for record in csv.DictReader(source):
+            iata = record["iata_code"].strip()
+            municipality = record["municipality"]
+            if len(iata) != 3 or not municipality.strip():
+                continue
+            if record["scheduled_service"] != "yes" or record["type"] == "closed":
+                continue
+            type_rank = AIRPORT_TYPE_RANKS.get(record["type"], OTHER_TYPE_RANK)
+            for city, match_rank in city_keys(municipality).items():
+                rows.append((city, iata, record["name"], record["iso_country"], type_rank, match_rank))
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    db = sqlite3.connect(db_path)
+    with db:
+        db.execute(
+            "CREATE TABLE airports (city TEXT NOT NULL, iata TEXT NOT NULL, name TEXT NOT NULL, "
+            "country TEXT NOT NULL, type_rank INTEGER NOT NULL, match_rank INTEGER NOT NULL)"
+        )
+        db.executemany("INSERT INTO airports VALUES (?, ?, ?, ?, ?, ?)", rows)
+        db.execute("CREATE INDEX airports_city ON airports (city, type_rank, match_rank)")
+    db.execute("VACUUM")
+    db.close()
+    return len(rows)
+
+def find_airport_code(db: sqlite3.Connection, city: str) -> Optional[str]:
+    """Return the best-ranked IATA code for a lowercase city name, if any"""
+    # Largest airport type first, then exact municipality matches, then file
+    # order so ties always resolve the same way
+    row = db.execute(
+        "SELECT iata FROM airports WHERE city = ? "
+        "ORDER BY type_rank, match_rank, rowid LIMIT 1",
+        (city,)
+    ).fetchone()
+    return row[0] if row else None
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python build_airports_db.py path/to/airports.csv")
+    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "airports.db")
+    count = build_airports_db(sys.argv[1], db_path)
+    print(f"Wrote {count} city keys to {db_path}")
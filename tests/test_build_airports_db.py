@@ -0,0 +1,97 @@
+import csv
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from build_airports_db import build_airports_db, city_keys, find_airport_code
+
+FIELDS = ["type", "name", "iso_country", "municipality", "scheduled_service", "iata_code"]
+
+# Trimmed OurAirports rows covering the ranking rules
+SAMPLE_AIRPORTS = [
+    ("medium_airport", "Ciampino–G. B. Pastine International Airport", "IT", "Rome", "yes", "CIA"),
+    ("large_airport", "Rome–Fiumicino Leonardo da Vinci International Airport", "IT", "Rome", "yes", "FCO"),
+    ("small_airport", "Cox Field", "US", "Paris", "yes", "PRX"),
+    ("large_airport", "Charles de Gaulle International Airport", "FR", "Paris", "yes", "CDG"),
+    ("large_airport", "Chicago Midway International Airport", "US", "Chicago", "yes", "MDW"),
+    ("large_airport", "Chicago O'Hare International Airport", "US", "Chicago", "yes", "ORD"),
+    ("large_airport", "Montreal / Pierre Elliott Trudeau International Airport", "CA", "Montréal", "yes", "YUL"),
+    ("large_airport", "Istanbul Airport", "TR", "Arnavutköy, Istanbul", "yes", "IST"),
+    ("large_airport", "Shanghai Pudong International Airport", "CN", "Shanghai (Pudong)", "yes", "PVG"),
+    ("medium_airport", "Old Town Airport", "DE", "Oldtown", "no", "OLD"),
+    ("closed", "Closed Field", "DE", "Closedtown", "yes", "CLO"),
+    ("medium_airport", "No Code Airport", "DE", "Nocode", "yes", ""),
+]
+
+class CityKeysTest(unittest.TestCase):
+    def test_plain_name_is_exact(self):
+        self.assertEqual(city_keys("Rome"), {"rome": 0})
+
+    def test_accents_are_folded(self):
+        self.assertEqual(city_keys("Montréal"), {"montréal": 0, "montreal": 0})
+
+    def test_districts_and_qualifiers_are_partial_matches(self):
+        self.assertEqual(city_keys("Arnavutköy, Istanbul")["istanbul"], 1)
+        self.assertEqual(city_keys("Shanghai (Pudong)")["shanghai"], 1)
+
+class FindAirportCodeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        source_path = os.path.join(self.tmpdir.name, "airports.csv")
+        with open(source_path, "w", newline="", encoding="utf-8") as source:
+            writer = csv.writer(source)
+            writer.writerow(FIELDS)
+            writer.writerows(SAMPLE_AIRPORTS)
+        db_path = os.path.join(self.tmpdir.name, "airports.db")
+        build_airports_db(source_path, db_path)
+        self.db = sqlite3.connect(db_path)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_large_airport_beats_medium_despite_name(self):
+        self.assertEqual(find_airport_code(self.db, "rome"), "FCO")
+
+    def test_large_airport_beats_small_namesake_abroad(self):
+        self.assertEqual(find_airport_code(self.db, "paris"), "CDG")
+
+    def test_ties_resolve_by_file_order(self):
+        # No traffic data to rank by; app.py pins ORD in AIRPORT_CODES
+        self.assertEqual(find_airport_code(self.db, "chicago"), "MDW")
+
+    def test_derived_city_keys(self):
+        self.assertEqual(find_airport_code(self.db, "montreal"), "YUL")
+        self.assertEqual(find_airport_code(self.db, "istanbul"), "IST")
+        self.assertEqual(find_airport_code(self.db, "shanghai"), "PVG")
+
+    def test_skips_unusable_airports(self):
+        for city in ("oldtown", "closedtown", "nocode", "atlantis"):
+            self.assertIsNone(find_airport_code(self.db, city))
+
+class BundledDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "airports.db")
+        self.db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_resolves_common_destinations(self):
+        expected = {
+            "madrid": "MAD",
+            "amsterdam": "AMS",
+            "dublin": "DUB",
+            "vienna": "VIE",
+            "lisbon": "LIS",
+            "zurich": "ZRH",
+            "rome": "FCO",
+            "frankfurt am main": "FRA",
+            "sao paulo": "GRU"
+        }
+        for city, iata in expected.items():
+            self.assertEqual(find_airport_code(self.db, city), iata, city)
+
+if __name__ == "__main__":
+    unittest.main()